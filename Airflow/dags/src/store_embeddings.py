@@ -1,7 +1,8 @@
 import os
 import logging
-import openai
+from openai import OpenAI
 import boto3
+import numpy as np
 from pinecone import Pinecone, ServerlessSpec
 from dotenv import load_dotenv
 from typing import List
@@ -19,7 +20,7 @@ load_dotenv()
 boto_config = Config(retries={'max_attempts': 10, 'mode': 'standard'}, max_pool_connections=50)
 
 # Initialize API keys and clients
-openai.api_key = os.getenv('OPENAI_API_KEY')
+openai_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 
 # Initialize Pinecone
 pinecone_client = Pinecone(api_key=os.getenv('PINECONE_API_KEY'))
@@ -37,12 +38,24 @@ AWS_BUCKET_NAME = os.getenv('AWS_BUCKET_NAME')
 CHUNK_SIZE = 1000
 CHUNK_OVERLAP = 200
 
-# Define Pinecone index map
-INDEX_MAP = {
-    'sporting': "sporting-regulations-embeddings",
-    'financial': "financial-regulations-embeddings",
-    'technical': "technical-regulations-embeddings"
-}
+# Symmetric INT8 quantization for embeddings, shared with the query side in
+# Streamlit/paddockpal1.py. ada-002 components stay well within +/-0.3, so a
+# fixed scale maps them onto the int8 range. Uniform scaling preserves
+# nearest-neighbour ordering, and the integer-valued vectors serialize far
+# smaller than full-precision floats. Both sides must agree on the flag and
+# scale or similarity ordering breaks.
+EMBEDDING_INT8_SCALE = 127.0 / 0.3
+USE_INT8_EMBEDDINGS = os.getenv('PINECONE_INT8_EMBEDDINGS') == '1'
+
+def quantize_embedding_int8(embedding: List[float]) -> List[int]:
+    """Quantize a float32 embedding to INT8 with the fixed symmetric scale."""
+    values = np.asarray(embedding, dtype=np.float32)
+    quantized = np.clip(np.round(values * EMBEDDING_INT8_SCALE), -127, 127)
+    return quantized.astype(np.int8).tolist()
+
+# Single Pinecone index for all regulation categories; the category travels
+# in each vector's metadata instead of selecting an index
+INDEX_NAME = "f1-regulations-embeddings"
 
 # Ensure Pinecone indexes exist
 def ensure_index_exists(index_name: str, dimension: int = 1536):
@@ -57,10 +70,9 @@ def ensure_index_exists(index_name: str, dimension: int = 1536):
     else:
         logging.info(f"Pinecone index already exists: {index_name}")
 
-# Ensure all necessary indexes are created
+# Ensure the necessary index is created
 def initialize_indexes():
-    for index_name in INDEX_MAP.values():
-        ensure_index_exists(index_name)
+    ensure_index_exists(INDEX_NAME)
 
 # PDF Loader using Docling
 class DoclingPDFLoader(BaseLoader):
@@ -106,8 +118,10 @@ def fetch_documents(folders: List[str], years: List[str]) -> List[dict]:
 def generate_embedding(text: str, model: str = "text-embedding-ada-002") -> List[float]:
     try:
         logging.info("Generating embedding for text...")
-        response = openai.Embedding.create(input=text, model=model)
-        embedding = response['data'][0]['embedding']
+        response = openai_client.embeddings.create(input=text, model=model)
+        embedding = response.data[0].embedding
+        if USE_INT8_EMBEDDINGS:
+            embedding = quantize_embedding_int8(embedding)
         logging.info("Embedding generated successfully.")
         return embedding
     except Exception as e:
@@ -158,7 +172,7 @@ def process_document(document: dict):
                 "category": category,
                 "text": chunk.page_content
             }
-            upsert_to_pinecone(INDEX_MAP[category], vector_id, embedding, metadata)
+            upsert_to_pinecone(INDEX_NAME, vector_id, embedding, metadata)
 
     except Exception as e:
         logging.error(f"Error processing document {document}: {e}")
@@ -1,12 +1,72 @@
 import streamlit as st
 import boto3
+import hashlib
 import os
+from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
+from boto3.s3.transfer import TransferConfig
 from dotenv import load_dotenv
 from io import BytesIO
+from PIL import Image
 
 # Load environment variables
 load_dotenv()
 
+# Objects above 8MB are fetched with parallel ranged GETs; smaller objects
+# still use a single request.
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=10,
+)
+
+# On-disk cache so a process restart revalidates by ETag instead of
+# re-downloading every object.
+DISK_CACHE_DIR = "/tmp/paddockpal_cache"
+
+def _cache_paths(bucket, key):
+    """Return the data and ETag sidecar paths for a cached S3 object."""
+    key_hash = hashlib.sha256(f"{bucket}/{key}".encode("utf-8")).hexdigest()
+    base = os.path.join(DISK_CACHE_DIR, key_hash)
+    return base + ".bin", base + ".etag"
+
+def fetch_object_cached(s3, bucket, key):
+    """Fetch an S3 object's bytes, reusing a local disk copy while its ETag matches.
+
+    With a cached copy on disk, a conditional GET (If-None-Match) lets S3
+    answer 304 without transferring the body; only changed objects are
+    re-downloaded and rewritten to the cache.
+    """
+    data_path, etag_path = _cache_paths(bucket, key)
+    cached_etag = None
+    if os.path.exists(data_path) and os.path.exists(etag_path):
+        with open(etag_path, "r") as f:
+            cached_etag = f.read().strip()
+
+    if cached_etag:
+        try:
+            obj = s3.get_object(Bucket=bucket, Key=key, IfNoneMatch=cached_etag)
+            data = obj['Body'].read()
+            etag = obj.get('ETag', '')
+        except ClientError as e:
+            if e.response.get('ResponseMetadata', {}).get('HTTPStatusCode') == 304:
+                with open(data_path, "rb") as f:
+                    return f.read()
+            raise
+    else:
+        buffer = BytesIO()
+        s3.download_fileobj(bucket, key, buffer, Config=S3_TRANSFER_CONFIG)
+        data = buffer.getvalue()
+        etag = s3.head_object(Bucket=bucket, Key=key).get('ETag', '')
+
+    os.makedirs(DISK_CACHE_DIR, exist_ok=True)
+    with open(data_path, "wb") as f:
+        f.write(data)
+    if etag:
+        with open(etag_path, "w") as f:
+            f.write(etag)
+    return data
+
 # Initialize S3 client
 @st.cache_resource
 def init_s3_client():
@@ -19,23 +79,46 @@ def init_s3_client():
     )
 
 @st.cache_data
-def load_history_content(bucket):
-    """Load history content and images from S3."""
-    s3 = init_s3_client()
+def load_history_content(_s3, bucket):
+    """Load history content and images from S3.
+
+    The leading underscore tells st.cache_data not to hash the boto3 client,
+    so reruns only key the cache on the bucket name.
+    """
     try:
-        history_text = s3.get_object(Bucket=bucket, Key='History/f1_history.txt')
-        history_content = history_text['Body'].read().decode('utf-8')
+        history_content = fetch_object_cached(_s3, bucket, 'History/f1_history.txt').decode('utf-8')
+
+        # Paginate the listing so prefixes with more than 1000 objects are not
+        # silently truncated; each page returns up to 1000 keys.
+        paginator = _s3.get_paginator('list_objects_v2')
+        image_keys = [
+            obj['Key']
+            for page in paginator.paginate(
+                Bucket=bucket,
+                Prefix='History/images/',
+                PaginationConfig={'PageSize': 1000},
+            )
+            for obj in page.get('Contents', [])
+            if obj['Key'].lower().endswith(('.jpg', '.png', '.jpeg'))
+        ]
+
+        def fetch_image(key):
+            raw = BytesIO(fetch_object_cached(_s3, bucket, key))
+            # Downscale and re-encode to WebP so the cache holds compact bytes
+            # instead of multi-MB originals.
+            image = Image.open(raw)
+            image.thumbnail((1200, 1200))
+            compact = BytesIO()
+            image.save(compact, 'WEBP', quality=80)
+            compact.seek(0)
+            return {'key': key, 'data': compact}
 
+        # Download the images concurrently; each GET is network-bound, and
+        # executor.map keeps the results in listing order.
         images = []
-        image_response = s3.list_objects_v2(Bucket=bucket, Prefix='History/images/')
-        if 'Contents' in image_response:
-            for obj in image_response['Contents']:
-                if obj['Key'].endswith(('.jpg', '.png', '.jpeg')):
-                    img_obj = s3.get_object(Bucket=bucket, Key=obj['Key'])
-                    images.append({
-                        'key': obj['Key'],
-                        'data': BytesIO(img_obj['Body'].read())
-                    })
+        if image_keys:
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                images = list(executor.map(fetch_image, image_keys))
 
         return {'content': history_content, 'images': images}
     except Exception as e:
@@ -49,7 +132,7 @@ def show_info():
 
     # History Section
     st.header("F1 History")
-    history_data = load_history_content("f1wikipedia")
+    history_data = load_history_content(init_s3_client(), "f1wikipedia")
 
     if history_data:
         # Split the content into paragraphs
@@ -1,9 +1,10 @@
 import streamlit as st
-import Streamlit.informationpage as informationpage
-import Streamlit.paddockpal1 as paddockpal1
-import Streamlit.tracks_drivers as tracks_drivers  # Import the new page
 import os
 
+# Page modules are imported lazily inside run(): each one pulls in heavy
+# dependencies (boto3, openai, pinecone) at import time, so loading them all
+# up front would delay the first render of every page.
+
 # Define available pages
 PAGES = {
     "informationpage": {
@@ -85,12 +86,15 @@ def run():
     current_page = st.session_state['current_page']
     st.title(PAGES[current_page]["title"])
 
-    # Render the selected page
+    # Render the selected page, importing only the module it needs
     if current_page == "informationpage":
+        from Streamlit import informationpage
         informationpage.show_info()
     elif current_page == "paddockpal1":
+        from Streamlit import paddockpal1
         paddockpal1.show_paddockpal()
     elif current_page == "tracks_drivers":
+        from Streamlit import tracks_drivers
         tracks_drivers.show_drivers_tracks()
 
 if __name__ == "__main__":
